@@ -4,62 +4,131 @@ Build script to create Windows .exe from Falcon BMS Performance Monitor
 This script will create a standalone executable using PyInstaller
 """
 
+import argparse
+import importlib.util
 import os
+import pkgutil
 import sys
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def check_pyinstaller():
-    """Check if PyInstaller is installed, install if not"""
-    try:
-        import PyInstaller
-        print("✅ PyInstaller is already installed")
-        return True
-    except ImportError:
-        print("📦 PyInstaller not found. Installing...")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
-            print("✅ PyInstaller installed successfully")
-            return True
-        except subprocess.CalledProcessError:
-            print("❌ Failed to install PyInstaller")
-            return False
+# pip package name -> importable module name
+DEPENDENCIES = {
+    "psutil": "psutil",
+    "nvidia-ml-py3": "pynvml",
+    "GPUtil": "GPUtil",
+    "pyinstaller": "PyInstaller"
+}
 
-def install_dependencies():
-    """Install all required dependencies"""
-    dependencies = [
-        "psutil",
-        "nvidia-ml-py3", 
-        "GPUtil",
-        "pyinstaller"
-    ]
+OPTIONAL_DEPENDENCIES = ["nvidia-ml-py3", "GPUtil"]
+
+# Import-time names of the GPU libraries that are only imported inside try blocks
+GPU_MODULES = ["pynvml", "GPUtil"]
+
+APP_NAME = "FalconBMS_PerformanceMonitor"
+
+# Skip the "Press Enter" prompts (set by -y/--yes or FALCONBMS_NONINTERACTIVE=1)
+NONINTERACTIVE = os.environ.get("FALCONBMS_NONINTERACTIVE") == "1"
+
+def get_output_dir(pack):
+    """Folder that holds the executable for the given pack mode"""
+    if pack == "onefile":
+        return Path("dist")
+    return Path("dist") / APP_NAME
+
+def is_installed(dep):
+    """Check whether a dependency is importable without importing it"""
+    return importlib.util.find_spec(DEPENDENCIES[dep]) is not None
+
+def report_install_failure(dep, error=None):
+    """Print a warning for a dependency that could not be installed"""
+    if error is not None:
+        print(f"⚠️  Warning: Could not install {dep} - {error}")
+    else:
+        print(f"⚠️  Warning: Could not install {dep}")
+    if dep in OPTIONAL_DEPENDENCIES:
+        print(f"   {dep} is optional for GPU monitoring")
+    else:
+        print(f"   {dep} is required - build may fail")
+
+def get_hidden_imports(include_nvidia=True):
+    """
+    Build the hidden import list by walking the installed GPU libraries
     
+    Standard library modules are found by PyInstaller's own analysis and are not listed.
+    """
+    hidden_imports = []
+    for name in GPU_MODULES:
+        if name == "pynvml" and not include_nvidia:
+            continue
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            continue
+        hidden_imports.append(name)
+        if spec.submodule_search_locations:
+            for module in pkgutil.walk_packages(spec.submodule_search_locations, prefix=f"{name}."):
+                if not {"test", "tests"} & set(module.name.split(".")):
+                    hidden_imports.append(module.name)
+    
+    hidden_imports.append("psutil")
+    return hidden_imports
+
+def install_dependencies(include_nvidia=True):
+    """Install all required dependencies"""
     print("📦 Installing dependencies...")
-    for dep in dependencies:
+    
+    # Skip anything that is already importable
+    dependencies = []
+    for dep in DEPENDENCIES:
+        if dep == "nvidia-ml-py3" and not include_nvidia:
+            continue
+        if is_installed(dep):
+            print(f"✅ {dep} already installed")
+        else:
+            dependencies.append(dep)
+    
+    if not dependencies:
+        return
+    
+    with open(os.devnull, 'w') as devnull:
+        # One pip run resolves everything at once instead of paying pip startup per package
         try:
-            # Use older subprocess syntax for compatibility
-            with open(os.devnull, 'w') as devnull:
-                result = subprocess.call([sys.executable, "-m", "pip", "install", dep], 
-                                       stdout=devnull, stderr=devnull)
-            if result == 0:
+            result = subprocess.call([sys.executable, "-m", "pip", "install", *dependencies],
+                                     stdout=devnull, stderr=devnull)
+        except Exception as e:
+            print(f"⚠️  Warning: Batched install failed - {e}")
+            result = 1
+        
+        if result == 0:
+            for dep in dependencies:
                 print(f"✅ {dep} installed")
-            else:
-                print(f"⚠️  Warning: Could not install {dep}")
-                if dep in ["nvidia-ml-py3", "GPUtil"]:
-                    print(f"   {dep} is optional for GPU monitoring")
+            importlib.invalidate_caches()
+            return
+        
+        # A single unavailable package fails the whole batch, so retry each one on its own.
+        # One at a time: concurrent pip runs would write into the same site-packages
+        # (and shared dependencies) without any locking.
+        for dep in dependencies:
+            try:
+                result = subprocess.call([sys.executable, "-m", "pip", "install", dep],
+                                         stdout=devnull, stderr=devnull)
+                if result == 0:
+                    print(f"✅ {dep} installed")
                 else:
-                    print(f"   {dep} is required - build may fail")
-        except Exception as e:
-            print(f"⚠️  Warning: Could not install {dep} - {e}")
-            if dep in ["nvidia-ml-py3", "GPUtil"]:
-                print(f"   {dep} is optional for GPU monitoring")
-            else:
-                print(f"   {dep} is required - build may fail")
+                    report_install_failure(dep)
+            except Exception as e:
+                report_install_failure(dep, e)
+    
+    importlib.invalidate_caches()
 
-def create_spec_file():
+def create_spec_file(include_nvidia=True):
     """Create a custom PyInstaller spec file for better control"""
+    hiddenimports = get_hidden_imports(include_nvidia)
+    
     spec_content = '''# -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_data_files
 
 block_cipher = None
 
@@ -67,24 +136,8 @@ a = Analysis(
     ['falcon_bms_monitor.py'],
     pathex=[],
     binaries=[],
-    datas=[],
-    hiddenimports=[
-        'nvidia_ml_py3',
-        'nvidia_ml_py3.py_nvml',
-        'pynvml',
-        'GPUtil',
-        'psutil',
-        'threading',
-        'collections',
-        'collections.deque',
-        'collections.defaultdict',
-        'dataclasses',
-        'datetime',
-        'json',
-        'time',
-        'os',
-        'sys'
-    ],
+    datas=collect_data_files('GPUtil', excludes=['**/tests/**', '**/*.md']),
+    hiddenimports=__HIDDENIMPORTS__,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -103,14 +156,15 @@ a = Analysis(
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
+    optimize=2,
 )
 
 # Force include nvidia libraries if available
 try:
-    import nvidia_ml_py3
-    print("Found nvidia_ml_py3 - including in build")
+    import pynvml
+    print("Found pynvml (nvidia-ml-py3) - including in build")
 except ImportError:
-    print("nvidia_ml_py3 not found")
+    print("pynvml (nvidia-ml-py3) not found")
 
 try:
     import GPUtil
@@ -131,7 +185,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
@@ -143,42 +197,38 @@ exe = EXE(
     icon=None,
 )
 '''
+    spec_content = spec_content.replace(
+        '__HIDDENIMPORTS__',
+        "[\n" + "".join(f"        {name!r},\n" for name in hiddenimports) + "    ]"
+    )
+    if not include_nvidia:
+        # pynvml is imported by the monitor itself, so it must be excluded explicitly
+        spec_content = spec_content.replace("'PySide6'\n", "'PySide6',\n        'pynvml'\n")
     
     with open('falcon_bms_monitor.spec', 'w') as f:
         f.write(spec_content)
     print("✅ Created custom PyInstaller spec file")
 
-def build_executable():
-    """Build the executable using PyInstaller"""
-    print("\n🔨 Building Windows executable...")
-    print("This may take a few minutes...")
+def get_build_command(pack, include_nvidia=True):
+    """PyInstaller command line for a build without a spec file"""
+    hidden_imports = []
+    for name in get_hidden_imports(include_nvidia):
+        hidden_imports += ["--hidden-import", name]
+    
+    # pynvml is imported by the monitor itself, so it must be excluded explicitly
+    nvidia_excludes = [] if include_nvidia else ["--exclude-module", "pynvml"]
     
-    # Build command options with comprehensive hidden imports
-    build_cmd = [
+    return [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",                    # Single executable file
+        f"--{pack}",                    # Folder (default) or single executable file
         "--console",                    # Keep console window
-        "--name", "FalconBMS_PerformanceMonitor",
+        "--noupx",                      # UPX slows builds and launches and trips antivirus heuristics
+        "--name", APP_NAME,
         "--distpath", "dist",
         "--workpath", "build", 
         "--specpath", ".",
-        # Comprehensive hidden imports for GPU libraries
-        "--hidden-import", "nvidia_ml_py3",
-        "--hidden-import", "nvidia_ml_py3.py_nvml",
-        "--hidden-import", "pynvml",  # Alternative name
-        "--hidden-import", "GPUtil", 
-        "--hidden-import", "psutil",
-        "--hidden-import", "threading",
-        "--hidden-import", "collections",
-        "--hidden-import", "dataclasses",
-        "--hidden-import", "datetime",
-        "--hidden-import", "json",
-        "--hidden-import", "time",
-        "--hidden-import", "os",
-        "--hidden-import", "sys",
-        # Force collect all submodules
-        "--collect-all", "nvidia_ml_py3",
-        "--collect-all", "GPUtil",
+        # Hidden imports for GPU libraries
+        *hidden_imports,
         # Exclude unnecessary modules to reduce size
         "--exclude-module", "matplotlib",
         "--exclude-module", "numpy", 
@@ -187,10 +237,35 @@ def build_executable():
         "--exclude-module", "tkinter",
         "--exclude-module", "PyQt5",
         "--exclude-module", "PyQt6",
-        # Optimize
+        *nvidia_excludes,
+        # Optimize (the generated spec file sets optimize=2 itself)
         "--optimize", "2",
         "falcon_bms_monitor.py"
     ]
+
+def build_executable(pack="onedir", spec_file=None, include_nvidia=True):
+    """
+    Build the executable using PyInstaller
+    
+    Args:
+        pack: "onedir" (fast startup, folder output) or "onefile" (single .exe
+              that unpacks itself to a temp folder on every launch)
+        spec_file: Build from this spec file instead of command line options
+        include_nvidia: Bundle the nvidia-ml-py3 (pynvml) GPU library
+    """
+    print("\n🔨 Building Windows executable...")
+    print("This may take a few minutes...")
+    
+    # A spec file carries all Analysis/EXE options itself, so don't repeat them here
+    if spec_file:
+        build_cmd = [
+            sys.executable, "-m", "PyInstaller",
+            "--distpath", "dist",
+            "--workpath", "build",
+            spec_file
+        ]
+    else:
+        build_cmd = get_build_command(pack, include_nvidia)
     
     try:
         # Run PyInstaller - compatible with older Python versions
@@ -201,11 +276,14 @@ def build_executable():
             print("✅ Executable built successfully!")
             
             # Check if file exists
-            exe_path = Path("dist/FalconBMS_PerformanceMonitor.exe")
+            exe_path = get_output_dir(pack) / f"{APP_NAME}.exe"
             if exe_path.exists():
-                file_size = exe_path.stat().st_size / (1024 * 1024)  # Size in MB
+                if pack == "onefile":
+                    file_size = exe_path.stat().st_size / (1024 * 1024)  # Size in MB
+                else:
+                    file_size = sum(f.stat().st_size for f in exe_path.parent.rglob("*") if f.is_file()) / (1024 * 1024)
                 print(f"📁 Executable location: {exe_path.absolute()}")
-                print(f"📏 File size: {file_size:.1f} MB")
+                print(f"📏 {'File' if pack == 'onefile' else 'Folder'} size: {file_size:.1f} MB")
                 return True
             else:
                 print("❌ Executable file not found after build")
@@ -223,31 +301,37 @@ def cleanup_build_files():
     """Clean up temporary build files"""
     print("\n🧹 Cleaning up build files...")
     
-    # Remove build directory
-    if os.path.exists("build"):
-        shutil.rmtree("build")
+    # Remove build directory (this also takes the __pycache__ folders PyInstaller leaves inside it)
+    if Path("build").exists():
+        shutil.rmtree("build", ignore_errors=True)
         print("✅ Removed build directory")
     
     # Remove spec file
-    if os.path.exists("falcon_bms_monitor.spec"):
-        os.remove("falcon_bms_monitor.spec")
+    if Path("falcon_bms_monitor.spec").exists():
+        Path("falcon_bms_monitor.spec").unlink(missing_ok=True)
         print("✅ Removed spec file")
     
     # Remove __pycache__
-    if os.path.exists("__pycache__"):
-        shutil.rmtree("__pycache__")
+    if Path("__pycache__").exists():
+        shutil.rmtree("__pycache__", ignore_errors=True)
         print("✅ Removed __pycache__")
 
-def create_readme():
+def create_readme(pack="onedir"):
     """Create a README file for the executable"""
-    readme_content = """# Falcon BMS Performance Monitor
+    if pack == "onefile":
+        launch_step = 'Double-click "FalconBMS_PerformanceMonitor.exe"'
+    else:
+        launch_step = ('Double-click "FalconBMS_PerformanceMonitor.exe" '
+                       '(keep it together with the other files in its folder)')
+    
+    readme_content = f"""# Falcon BMS Performance Monitor
 
 ## What is this?
 This executable monitors your system performance while running Falcon BMS and identifies bottlenecks in real-time.
 
 ## How to use:
 1. Start Falcon BMS (the tool will detect it automatically)
-2. Double-click "FalconBMS_PerformanceMonitor.exe"
+2. {launch_step}
 3. Watch the real-time performance analysis
 4. Follow the recommendations to optimize performance
 
@@ -274,6 +358,10 @@ This executable monitors your system performance while running Falcon BMS and id
 - The tool looks for common Falcon BMS process names
 - Run as Administrator if you encounter permission issues
 
+## Build notes:
+- Built with Python optimization level 2: docstrings and assert statements
+  are stripped from all bundled modules, not just the monitor script
+
 ## Controls:
 - Press Ctrl+C to stop monitoring
 - The display updates every 2 seconds
@@ -281,12 +369,33 @@ This executable monitors your system performance while running Falcon BMS and id
 Built with Python and love for the Falcon BMS community!
 """
     
-    with open("dist/README.txt", "w") as f:
+    with open(get_output_dir(pack) / "README.txt", "w") as f:
         f.write(readme_content)
-    print("✅ Created README.txt in dist folder")
+    print(f"✅ Created README.txt in {get_output_dir(pack)} folder")
 
 def main():
     """Main build process"""
+    global NONINTERACTIVE
+    parser = argparse.ArgumentParser(description="Build the Falcon BMS Performance Monitor executable")
+    parser.add_argument("--pack", choices=["onedir", "onefile"], default=None,
+                        help="onedir starts faster; onefile produces a single .exe (default: onedir)")
+    parser.add_argument("--spec", action="store_true",
+                        help="build a single .exe from a generated spec file instead of command line options")
+    parser.add_argument("--no-nvidia", action="store_true",
+                        help="don't install or bundle the nvidia-ml-py3 GPU library")
+    parser.add_argument("-y", "--yes", action="store_true",
+                        help="don't wait for Enter before exiting (for unattended builds)")
+    args = parser.parse_args()
+    if args.yes:
+        NONINTERACTIVE = True
+    if args.spec:
+        # The generated spec bundles everything into one EXE
+        if args.pack == "onedir":
+            parser.error("--spec only supports --pack onefile")
+        args.pack = "onefile"
+    elif args.pack is None:
+        args.pack = "onedir"
+    
     print("🚀 Falcon BMS Performance Monitor - EXE Builder")
     print("=" * 60)
     
@@ -296,33 +405,53 @@ def main():
         print("   Make sure you saved the Python script as 'falcon_bms_monitor.py'")
         return False
     
-    # Step 1: Install dependencies
-    install_dependencies()
+    # nvidia-ml-py3 is pure Python and loads the driver at runtime, so it is bundled
+    # regardless of the build machine's GPU - the exe runs on other people's systems
+    include_nvidia = not args.no_nvidia
+    if not include_nvidia:
+        print("⚠️  Building without nvidia-ml-py3 - the exe will fall back to GPUtil/nvidia-smi for NVIDIA GPUs")
+    
+    # Step 1: Install dependencies (PyInstaller included) while creating the output directory
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dist_created = executor.submit(os.makedirs, "dist", exist_ok=True)
+        install_dependencies(include_nvidia)
+        dist_created.result()
     
-    # Step 2: Check PyInstaller
-    if not check_pyinstaller():
+    # Step 2: Check PyInstaller in a fresh process - a --user install made just now
+    # may live in a site dir this interpreter never added to sys.path
+    with open(os.devnull, 'w') as devnull:
+        pyinstaller_ok = subprocess.call([sys.executable, "-m", "PyInstaller", "--version"],
+                                         stdout=devnull, stderr=devnull) == 0
+    if not pyinstaller_ok:
+        print("❌ PyInstaller is not installed")
         return False
     
-    # Step 3: Create output directory
-    os.makedirs("dist", exist_ok=True)
+    # Step 3: Build executable
+    spec_file = None
+    if args.spec:
+        create_spec_file(include_nvidia)
+        spec_file = "falcon_bms_monitor.spec"
     
-    # Step 4: Build executable
-    success = build_executable()
+    success = build_executable(args.pack, spec_file, include_nvidia)
     
     if success:
-        # Step 5: Create documentation
-        create_readme()
+        # Step 4: Create documentation
+        create_readme(args.pack)
         
-        # Step 6: Clean up
+        # Step 5: Clean up
         cleanup_build_files()
         
         print("\n🎉 SUCCESS!")
         print("=" * 60)
         print("Your executable is ready:")
-        print(f"📁 Location: {os.path.abspath('dist/FalconBMS_PerformanceMonitor.exe')}")
+        output_dir = get_output_dir(args.pack)
+        print(f"📁 Location: {(output_dir / f'{APP_NAME}.exe').absolute()}")
         print("\n📋 Next steps:")
-        print("1. Navigate to the 'dist' folder")
-        print("2. Copy 'FalconBMS_PerformanceMonitor.exe' wherever you want")
+        print(f"1. Navigate to the '{output_dir}' folder")
+        if args.pack == "onefile":
+            print("2. Copy 'FalconBMS_PerformanceMonitor.exe' wherever you want")
+        else:
+            print(f"2. Copy the whole '{APP_NAME}' folder wherever you want")
         print("3. Run it while Falcon BMS is running")
         print("4. Read 'README.txt' for detailed instructions")
         
@@ -334,9 +463,11 @@ def main():
 if __name__ == "__main__":
     try:
         success = main()
-        input(f"\nPress Enter to exit...")
+        if not NONINTERACTIVE:
+            input(f"\nPress Enter to exit...")
     except KeyboardInterrupt:
         print("\n\nBuild cancelled by user.")
     except Exception as e:
         print(f"\nUnexpected error: {e}")
-        input("Press Enter to exit...")
\ No newline at end of file
+        if not NONINTERACTIVE:
+            input("Press Enter to exit...")
\ No newline at end of file
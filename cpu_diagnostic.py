@@ -4,64 +4,99 @@ CPU Measurement Diagnostic Tool
 Tests different CPU measurement methods to find the most accurate one
 """
 
-import psutil
+import argparse
+import os
+import re
 import time
-import threading
-from collections import deque
+from statistics import fmean
+
+# psutil is imported inside the functions that use it, so the script reaches
+# its prompt without first loading the native extension
+
+# Skip the "Press Enter" prompts (set by -y/--yes or FALCONBMS_NONINTERACTIVE=1)
+NONINTERACTIVE = os.environ.get("FALCONBMS_NONINTERACTIVE") == "1"
+
+# VR and flight sim related process name keywords
+_VR_RE = re.compile(r'vr|steam|oculus|meta|falcon|bms|simulator|runtime')
+
+# Prebuilt usage bars, one block per 5%
+_BARS = tuple("█" * i for i in range(21))
 
 def test_cpu_measurement_methods():
     """Test different CPU measurement approaches"""
+    import psutil
+    
     print("🔍 Testing CPU Measurement Methods")
     print("=" * 50)
     print("Please keep your flight simulator running in VR...")
-    print("Taking measurements over 10 seconds...\n")
+    print("Taking measurements over 5 seconds...\n")
     
     # Method 1: psutil with no interval (cached)
     cpu1 = psutil.cpu_percent(interval=None)
     print(f"Method 1 - psutil(interval=None):     {cpu1:6.1f}%")
     
-    # Method 2: psutil with 1 second interval
-    cpu2 = psutil.cpu_percent(interval=1.0)
-    print(f"Method 2 - psutil(interval=1.0):      {cpu2:6.1f}%")
+    # Methods 2-5 all aggregate one 5 second stream of short per-core samples,
+    # so they see the same CPU activity instead of five different windows
+    samples_per_second = 5
+    core_samples = []
+    for _ in range(5 * samples_per_second):
+        core_samples.append(psutil.cpu_percent(interval=1.0 / samples_per_second, percpu=True))
+    overall = [fmean(cores) for cores in core_samples]
+    
+    # Method 2: 1 second window
+    cpu2 = fmean(overall[:samples_per_second])
+    print(f"Method 2 - 1 second window:           {cpu2:6.1f}%")
     
-    # Method 3: psutil with blocking measurement
-    cpu3 = psutil.cpu_percent(interval=2.0)
-    print(f"Method 3 - psutil(interval=2.0):      {cpu3:6.1f}%")
+    # Method 3: 2 second window
+    cpu3 = fmean(overall[:2 * samples_per_second])
+    print(f"Method 3 - 2 second window:           {cpu3:6.1f}%")
     
     # Method 4: Average over multiple samples
     print("Method 4 - Multiple samples (5 seconds)...")
     samples = []
     for i in range(5):
-        sample = psutil.cpu_percent(interval=1.0)
+        sample = fmean(overall[i * samples_per_second:(i + 1) * samples_per_second])
         samples.append(sample)
         print(f"  Sample {i+1}: {sample:6.1f}%")
-    cpu4 = sum(samples) / len(samples)
+    cpu4 = fmean(samples)
     print(f"Method 4 - Average of 5 samples:      {cpu4:6.1f}%")
     
     # Method 5: Per-core analysis
-    per_core = psutil.cpu_percent(interval=1.0, percpu=True)
+    per_core = [fmean(core) for core in zip(*core_samples)]
     max_core = max(per_core)
-    avg_core = sum(per_core) / len(per_core)
+    avg_core = fmean(per_core)
     print(f"Method 5 - Per-core average:          {avg_core:6.1f}%")
     print(f"Method 5 - Highest core:              {max_core:6.1f}%")
     
     print(f"\nCore utilization breakdown:")
     for i, core_usage in enumerate(per_core):
-        bar = "█" * int(core_usage / 5)  # Scale for display
+        bar = _BARS[min(20, int(core_usage / 5))]  # Scale for display
         print(f"  Core {i:2d}: {core_usage:6.1f}% {bar}")
 
 def find_intensive_processes():
     """Find processes using the most CPU"""
+    import psutil
+    
     print(f"\n🔍 Top CPU-consuming processes:")
     print("=" * 50)
     
+    # Prime every process first, then measure them all over a single 1 second window
+    # (cpu_percent(interval=1.0) per process would sleep once for each process)
+    procs = list(psutil.process_iter(['pid', 'name']))
+    for proc in procs:
+        try:
+            proc.cpu_percent(None)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    
+    time.sleep(1.0)
+    
     # Get all processes with CPU usage
     processes = []
-    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
+    for proc in procs:
         try:
             proc_info = proc.info
-            # Get CPU usage over 1 second
-            cpu_usage = proc.cpu_percent(interval=1.0)
+            cpu_usage = proc.cpu_percent(None)
             if cpu_usage > 0.1:  # Only show processes using some CPU
                 processes.append({
                     'name': proc_info['name'],
@@ -79,10 +114,9 @@ def find_intensive_processes():
         print(f"  {i+1:2d}. {proc['name']:<25} {proc['cpu']:6.1f}% (PID: {proc['pid']})")
     
     # Look for VR and flight sim related processes
-    vr_keywords = ['vr', 'steam', 'oculus', 'meta', 'falcon', 'bms', 'simulator', 'runtime']
     vr_processes = []
     for proc in processes:
-        if any(keyword in proc['name'].lower() for keyword in vr_keywords):
+        if _VR_RE.search(proc['name'].lower()):
             vr_processes.append(proc)
     
     if vr_processes:
@@ -90,41 +124,74 @@ def find_intensive_processes():
         for proc in vr_processes:
             print(f"  • {proc['name']:<25} {proc['cpu']:6.1f}% (PID: {proc['pid']})")
 
+def refresh_process_cache(procs):
+    """Add newly started processes to the pid -> Process cache and prime them"""
+    import psutil
+    
+    for pid in psutil.pids():
+        if pid in procs:
+            continue
+        try:
+            proc = psutil.Process(pid)
+            proc.cpu_percent(None)
+            procs[pid] = proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
 def continuous_monitoring():
     """Monitor CPU continuously for patterns"""
+    import psutil
+    
     print(f"\n🔍 Continuous CPU Monitoring (30 seconds)")
     print("=" * 50)
     print("Time     Overall  Max Core  Top Process")
     print("-" * 50)
     
-    start_time = time.time()
-    while time.time() - start_time < 30:
-        # Overall CPU
-        overall_cpu = psutil.cpu_percent(interval=None)
-        
-        # Per-core CPU
+    # Prime the counters so the first readings are not meaningless 0.0 values.
+    # Process handles are kept between ticks so each cpu_percent() call only
+    # needs the delta against the previous sample of the same handle.
+    psutil.cpu_percent(interval=None, percpu=True)
+    procs = {}
+    refresh_process_cache(procs)
+    time.sleep(1.0)
+    
+    # monotonic() so clock adjustments can't stretch or cut short the window
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        # Per-core CPU; overall is derived from the same sample so it shares
+        # the primed baseline instead of needing a counter of its own
         per_core = psutil.cpu_percent(interval=None, percpu=True)
+        overall_cpu = fmean(per_core) if per_core else 0.0
         max_core = max(per_core) if per_core else 0
         
         # Find top process
         top_process = "Unknown"
         top_cpu = 0
-        for proc in psutil.process_iter(['name', 'cpu_percent']):
+        dead = []
+        for pid, proc in procs.items():
             try:
-                cpu = proc.cpu_percent()
+                cpu = proc.cpu_percent(None)
                 if cpu > top_cpu:
                     top_cpu = cpu
-                    top_process = proc.info['name'][:15]
+                    top_process = proc.name()[:15]
+            except psutil.NoSuchProcess:
+                dead.append(pid)
             except:
                 continue
+        for pid in dead:
+            del procs[pid]
+        refresh_process_cache(procs)
         
-        timestamp = time.strftime("%H:%M:%S")
+        t = time.localtime()
+        timestamp = f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
         print(f"{timestamp}  {overall_cpu:6.1f}%  {max_core:6.1f}%   {top_process} ({top_cpu:.1f}%)")
         
         time.sleep(2)
 
 def system_info():
     """Display system information"""
+    import psutil
+    
     print("🔍 System Information")
     print("=" * 50)
     
@@ -146,12 +213,19 @@ def system_info():
 
 def main():
     """Run all diagnostics"""
+    global NONINTERACTIVE
+    parser = argparse.ArgumentParser(description="Falcon BMS CPU measurement diagnostic")
+    parser.add_argument("-y", "--yes", action="store_true", help="don't wait for Enter before and after the run")
+    if parser.parse_args().yes:
+        NONINTERACTIVE = True
+    
     print("🔧 Falcon BMS CPU Measurement Diagnostic")
     print("=" * 60)
     print("This tool will help identify why CPU measurements seem low")
     print("Make sure Falcon BMS is running in VR before proceeding!\n")
     
-    input("Press Enter when ready to start diagnostics...")
+    if not NONINTERACTIVE:
+        input("Press Enter when ready to start diagnostics...")
     
     system_info()
     print()
@@ -171,4 +245,5 @@ def main():
 
 if __name__ == "__main__":
     main()
-    input("\nPress Enter to exit...")
\ No newline at end of file
+    if not NONINTERACTIVE:
+        input("\nPress Enter to exit...")
\ No newline at end of file
@@ -4,18 +4,28 @@ Diagnostic script to troubleshoot Falcon BMS Monitor issues
 Run this to check what processes are running and what GPU libraries are available
 """
 
-import psutil
+import argparse
+import re
 import sys
 import os
 
+# psutil is imported inside find_running_processes() so startup stays fast
+
+# Skip the "Press Enter" prompts (set by -y/--yes or FALCONBMS_NONINTERACTIVE=1)
+NONINTERACTIVE = os.environ.get("FALCONBMS_NONINTERACTIVE") == "1"
+
+# Process name patterns (matched against lowercased names)
+_FALCON_RE = re.compile(r'falcon|bms')
+_GAME_RE = re.compile(r'game|sim|\.exe')
+
 def check_gpu_libraries():
     """Check which GPU libraries are available"""
     print("🔍 GPU Library Check:")
     print("-" * 40)
     
-    # Check nvidia-ml-py3
+    # Check nvidia-ml-py3 (the package installs the 'pynvml' module)
     try:
-        import nvidia_ml_py3 as nvml
+        import pynvml as nvml
         nvml.nvmlInit()
         device_count = nvml.nvmlDeviceGetCount()
         print(f"✅ nvidia-ml-py3: Available ({device_count} GPU(s) detected)")
@@ -23,7 +33,9 @@ def check_gpu_libraries():
         # Get GPU info
         if device_count > 0:
             handle = nvml.nvmlDeviceGetHandleByIndex(0)
-            name = nvml.nvmlDeviceGetName(handle).decode('utf-8')
+            name = nvml.nvmlDeviceGetName(handle)
+            if isinstance(name, bytes):
+                name = name.decode('utf-8')
             print(f"   GPU 0: {name}")
     except ImportError:
         print("❌ nvidia-ml-py3: Not available (ImportError)")
@@ -44,6 +56,8 @@ def check_gpu_libraries():
 
 def find_running_processes():
     """Find all running processes that might be Falcon BMS"""
+    import psutil
+    
     print("\n🔍 Process Detection:")
     print("-" * 40)
     
@@ -56,35 +70,34 @@ def find_running_processes():
         'Falcon.exe', 'falcon.exe', 'FALCON.exe'
     ]
     
+    falcon_names_lower = {name.lower() for name in falcon_names}
+    
     print("Looking for Falcon BMS processes...")
     found_processes = []
     
-    # Get all running processes
+    # Get all running processes (only pid and name are used)
     all_processes = []
-    for proc in psutil.process_iter(['pid', 'name', 'exe', 'cmdline']):
+    for proc in psutil.process_iter(['pid', 'name']):
         try:
             all_processes.append({
                 'pid': proc.info['pid'],
-                'name': proc.info['name'] or 'Unknown',
-                'exe': proc.info['exe'] or 'Unknown',
-                'cmdline': ' '.join(proc.info['cmdline'] or [])
+                'name': proc.info['name'] or 'Unknown'
             })
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             continue
     
     # Check for exact matches
     for proc in all_processes:
-        for falcon_name in falcon_names:
-            if falcon_name.lower() == proc['name'].lower():
-                found_processes.append(proc)
-                print(f"✅ Found exact match: {proc['name']} (PID: {proc['pid']})")
+        if proc['name'].lower() in falcon_names_lower:
+            found_processes.append(proc)
+            print(f"✅ Found exact match: {proc['name']} (PID: {proc['pid']})")
     
     # Check for partial matches
     print("\nChecking for partial matches (any process containing 'falcon' or 'bms'):")
     partial_matches = []
     for proc in all_processes:
         name_lower = proc['name'].lower()
-        if ('falcon' in name_lower or 'bms' in name_lower) and proc not in found_processes:
+        if _FALCON_RE.search(name_lower) and proc not in found_processes:
             partial_matches.append(proc)
             print(f"🔍 Partial match: {proc['name']} (PID: {proc['pid']})")
     
@@ -94,7 +107,7 @@ def find_running_processes():
         game_processes = []
         for proc in all_processes:
             name_lower = proc['name'].lower()
-            if ('game' in name_lower or 'sim' in name_lower or '.exe' in name_lower):
+            if _GAME_RE.search(name_lower):
                 if len(game_processes) < 20:  # Limit output
                     game_processes.append(proc)
         
@@ -120,6 +133,12 @@ def check_system_info():
 
 def main():
     """Run all diagnostic checks"""
+    global NONINTERACTIVE
+    parser = argparse.ArgumentParser(description="Falcon BMS Monitor diagnostic tool")
+    parser.add_argument("-y", "--yes", action="store_true", help="don't wait for Enter before exiting")
+    if parser.parse_args().yes:
+        NONINTERACTIVE = True
+    
     print("🔧 Falcon BMS Monitor Diagnostic Tool")
     print("=" * 50)
     
@@ -151,4 +170,5 @@ def main():
 
 if __name__ == "__main__":
     main()
-    input("\nPress Enter to exit...")
\ No newline at end of file
+    if not NONINTERACTIVE:
+        input("\nPress Enter to exit...")
\ No newline at end of file
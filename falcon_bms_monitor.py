@@ -4,35 +4,78 @@ Falcon BMS Performance Monitor and Bottleneck Detector
 Monitors CPU, GPU, and Memory usage to identify performance bottlenecks
 """
 
+import atexit
+import heapq
 import psutil
 import time
 import threading
 import json
-from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from array import array
+from datetime import datetime
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 import os
 import sys
 
-# Try to import GPU monitoring libraries
-NVIDIA_AVAILABLE = False  # Disable nvidia-ml-py3 to avoid packaging issues
+# ANSI "cursor home + clear screen"
+CLEAR_SCREEN = '\x1b[H\x1b[2J'
 
-try:
-    import GPUtil
-    GPUTIL_AVAILABLE = True
-    print("✅ GPU monitoring enabled via GPUtil")
-except ImportError:
-    GPUTIL_AVAILABLE = False
-    print("Warning: GPUtil not available. Install with: pip install GPUtil")
+# Full-width confidence bar, sliced to length for display
+FULL_BAR = "█" * 20
+
+# Bottleneck types, in the order their scores are stored in the metrics history
+BOTTLENECK_TYPES = ('CPU', 'Memory', 'GPU', 'GPU_Memory', 'None')
+_CPU, _MEMORY, _GPU, _GPU_MEMORY, _NONE = range(len(BOTTLENECK_TYPES))
+
+# Fixed recommendation texts (only the single-core and balanced notes carry a number)
+_REC_CPU_SINGLE_CORE = (
+    "Falcon BMS is limited by single-threaded performance",
+    "Consider overclocking your CPU for better single-core performance",
+    "Lower CPU-intensive settings: AI traffic, ground objects, weather complexity"
+)
+_REC_BALANCED = "System performance appears balanced. No immediate bottlenecks detected."
+_RECOMMENDATIONS = {
+    "CPU": (
+        "CPU bottleneck detected - reduce CPU-intensive settings",
+        "Close unnecessary background applications",
+        "Lower AI traffic and ground object density",
+        "Consider upgrading to a faster CPU"
+    ),
+    "Memory": (
+        "Memory shortage detected - close unnecessary applications",
+        "Consider adding more RAM to your system",
+        "Lower texture quality in Falcon BMS settings",
+        "Check for memory leaks in background processes"
+    ),
+    "GPU": (
+        "GPU bottleneck - lower graphics settings in Falcon BMS",
+        "Reduce anti-aliasing and post-processing effects",
+        "Lower VR resolution or use dynamic resolution scaling",
+        "Check GPU temperatures and fan curves"
+    ),
+    "GPU_Memory": (
+        "GPU memory bottleneck - lower texture quality and resolution",
+        "Reduce visual range and object density in VR",
+        "Close other GPU-intensive applications",
+        "Consider a GPU upgrade with more VRAM"
+    ),
+}
 
 
 @dataclass
 class SystemMetrics:
     """Data class to hold system performance metrics"""
-    timestamp: datetime
+    # No per-instance __dict__; up to history_size of these are kept in memory.
+    # (Declared by hand instead of dataclass(slots=True) to keep Python < 3.10 working)
+    __slots__ = ('timestamp', 'cpu_percent', 'cpu_per_core', 'cpu_max_core',
+                 'memory_percent', 'memory_used_gb', 'memory_available_gb',
+                 'gpu_utilization', 'gpu_memory_percent', 'gpu_memory_used_gb', 'gpu_temperature',
+                 'falcon_bms_cpu', 'falcon_bms_memory_mb', 'bottleneck', 'bottleneck_score')
+    
+    timestamp: float    # time.monotonic(); wall-clock time is only needed for display
     cpu_percent: float
     cpu_per_core: List[float]
+    cpu_max_core: float
     memory_percent: float
     memory_used_gb: float
     memory_available_gb: float
@@ -46,21 +89,121 @@ class SystemMetrics:
     bottleneck_score: Dict[str, float]
 
 
+def _score_kernel(max_core: float, cpu_percent: float, falcon_cpu: float,
+                  memory_percent: float, gpu_utilization: float, gpu_memory_percent: float,
+                  gpu_available: bool, params: Tuple[float, ...]) -> List[float]:
+    """
+    Numeric core of the bottleneck analysis
+    Returns normalized scores in BOTTLENECK_TYPES order
+    """
+    (cpu_high, inv_cpu_norm, memory_high, inv_memory_norm,
+     gpu_high, inv_gpu_norm, gpu_memory_high, inv_gpu_memory_norm) = params
+    
+    scores = [0.0] * len(BOTTLENECK_TYPES)
+    
+    # Enhanced CPU bottleneck analysis for multi-core systems.
+    # Single-core saturation is more important than overall CPU %
+    if max_core > 85.0:
+        scores[_CPU] += 0.8  # High confidence for single-core bottleneck
+    elif max_core > 70.0:
+        scores[_CPU] += 0.5  # Moderate confidence
+    elif max_core > 60.0:
+        scores[_CPU] += 0.3  # Some CPU pressure
+    
+    # Overall CPU usage (less important for gaming)
+    if cpu_percent > cpu_high:
+        scores[_CPU] += (cpu_percent - cpu_high) * inv_cpu_norm
+    
+    # Falcon BMS specific CPU analysis
+    if falcon_cpu > 150.0:  # More than 1.5 cores
+        scores[_CPU] += 0.4
+    elif falcon_cpu > 100.0:  # More than 1 core
+        scores[_CPU] += 0.2
+    
+    # Memory bottleneck analysis
+    if memory_percent > memory_high:
+        scores[_MEMORY] += (memory_percent - memory_high) * inv_memory_norm
+    
+    # GPU bottleneck analysis
+    if gpu_available:
+        if gpu_utilization > gpu_high:
+            scores[_GPU] += (gpu_utilization - gpu_high) * inv_gpu_norm
+        
+        if gpu_memory_percent > gpu_memory_high:
+            scores[_GPU_MEMORY] += (gpu_memory_percent - gpu_memory_high) * inv_gpu_memory_norm
+    
+    # If no significant bottleneck detected
+    max_score = max(scores)
+    if max_score < 0.3:
+        scores[_NONE] = 1.0
+    
+    # Normalize scores
+    total_score = sum(scores)
+    if total_score > 0:
+        scores = [score / total_score for score in scores]
+    
+    return scores
+
+
+def enable_ansi_console() -> bool:
+    """Enable ANSI escape sequences in the console (needed on Windows 10+)"""
+    if os.name != 'nt':
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+
 class PerformanceMonitor:
-    def __init__(self, sample_interval: float = 1.0, history_size: int = 300):
+    def __init__(self, sample_interval: float = 1.0, history_size: int = 300,
+                 gpu_sample_divisor: int = 10):
         """
         Initialize the performance monitor
         
         Args:
-            sample_interval: Time between samples in seconds
+            sample_interval: Time between samples in seconds (1 second is enough to
+                             catch Falcon BMS bottlenecks; faster sampling mostly adds load)
             history_size: Number of samples to keep in history
+            gpu_sample_divisor: Read GPU metrics only every Nth sample (GPU queries are
+                                slow and can cause in-game stutter)
         """
         self.sample_interval = sample_interval
         self.history_size = history_size
-        self.metrics_history = deque(maxlen=history_size)
+        self._gpu_sample_every = max(1, gpu_sample_divisor)
+        self._gpu_tick = 0
+        self._last_gpu = (0.0, 0.0, 0.0, 0.0)
+        
+        # Metrics history as parallel ring buffers (timestamps, bottleneck index and
+        # scores per sample) rather than a deque of SystemMetrics objects; the
+        # windowed analysis only needs these fields. _write_idx counts every sample
+        # ever written, the slot for a sample is _write_idx % history_size.
+        n_types = len(BOTTLENECK_TYPES)
+        self._hist_timestamp = array('d', [0.0]) * history_size
+        self._hist_bottleneck = array('b', [0]) * history_size
+        self._hist_scores = array('d', [0.0]) * (history_size * n_types)
+        self._write_idx = 0
+        self._current = None
+        
+        # Last get_bottleneck_analysis() result as (write_idx, window_seconds, analysis),
+        # so display refreshes between two samples don't redo the analysis
+        self._cached_analysis = None
         self.running = False
         self.monitor_thread = None
         
+        # Falcon BMS process lookup (the handle is reused until the process exits)
+        self._falcon_names = frozenset(name.lower() for name in
+                                       ('Falcon BMS.exe', 'bms.exe', 'falcon4.exe', 'FalconBMS.exe'))
+        self._falcon_proc = None
+        self._last_process_cache_clear = time.monotonic()
+        
         # Bottleneck thresholds
         self.thresholds = {
             'cpu_high': 85.0,
@@ -73,14 +216,60 @@ class PerformanceMonitor:
         self.gpu_available = self._init_gpu_monitoring()
         
     def _init_gpu_monitoring(self) -> bool:
-        """Initialize GPU monitoring capabilities"""
-        return GPUTIL_AVAILABLE  # Use GPUtil only for reliable .exe packaging
+        """
+        Initialize GPU monitoring capabilities
+        
+        NVML is queried in-process through a cached device handle; GPUtil (which runs
+        nvidia-smi on every call) is only used when NVML is not available. Both are
+        imported here rather than at module level to keep startup fast.
+        """
+        self._nvml = None
+        self._nvml_handle = None
+        self._gputil = None
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            try:
+                self._nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            finally:
+                atexit.register(pynvml.nvmlShutdown)
+            self._nvml = pynvml
+            print("✅ GPU monitoring enabled via NVML")
+            return True
+        except ImportError:
+            pass
+        except Exception as e:
+            print(f"NVML not available ({e}), falling back to GPUtil")
+        
+        try:
+            import GPUtil
+            self._gputil = GPUtil
+            print("✅ GPU monitoring enabled via GPUtil")
+            return True
+        except ImportError:
+            print("Warning: No GPU monitoring library available. Install with: pip install nvidia-ml-py3 GPUtil")
+            return False
 
     def _get_gpu_metrics(self) -> Tuple[float, float, float, float]:
-        """Get GPU metrics using GPUtil (more reliable for .exe packaging)"""
-        if GPUTIL_AVAILABLE:
+        """Get GPU metrics using NVML, or GPUtil as a fallback"""
+        if self._nvml is not None:
+            try:
+                handle = self._nvml_handle
+                utilization = self._nvml.nvmlDeviceGetUtilizationRates(handle)
+                memory = self._nvml.nvmlDeviceGetMemoryInfo(handle)
+                temperature = self._nvml.nvmlDeviceGetTemperature(handle, self._nvml.NVML_TEMPERATURE_GPU)
+                memory_percent = memory.used / memory.total * 100 if memory.total else 0.0
+                return (
+                    float(utilization.gpu),       # GPU utilization %
+                    memory_percent,               # GPU memory %
+                    memory.used / (1024**3),      # GPU memory used in GB
+                    float(temperature)            # GPU temperature
+                )
+            except Exception as e:
+                print(f"GPU monitoring error: {e}")
+        elif self._gputil is not None:
             try:
-                gpus = GPUtil.getGPUs()
+                gpus = self._gputil.getGPUs()
                 if gpus:
                     gpu = gpus[0]
                     return (
@@ -95,13 +284,25 @@ class PerformanceMonitor:
         return 0.0, 0.0, 0.0, 0.0
 
     def _find_falcon_bms_process(self) -> Optional[psutil.Process]:
-        """Find the Falcon BMS process"""
-        falcon_names = ['Falcon BMS.exe', 'bms.exe', 'falcon4.exe', 'FalconBMS.exe']
-        
-        for proc in psutil.process_iter(['pid', 'name']):
+        """Find the Falcon BMS process, reusing the cached handle while it is alive"""
+        if self._falcon_proc is not None and self._falcon_proc.is_running():
+            return self._falcon_proc
+        self._falcon_proc = None
+        
+        # process_iter() keeps its own Process cache; drop it now and then so it
+        # doesn't hold on to handles of long-gone processes
+        now = time.monotonic()
+        if now - self._last_process_cache_clear > 60.0:
+            if hasattr(psutil.process_iter, 'cache_clear'):
+                psutil.process_iter.cache_clear()
+            self._last_process_cache_clear = now
+        
+        for proc in psutil.process_iter(['name']):
             try:
-                if any(name.lower() in proc.info['name'].lower() for name in falcon_names):
-                    return psutil.Process(proc.info['pid'])
+                proc_name = proc.info['name']
+                if proc_name and proc_name.lower() in self._falcon_names:
+                    self._falcon_proc = proc
+                    return proc
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
         return None
@@ -111,69 +312,35 @@ class PerformanceMonitor:
         Analyze current metrics to determine bottleneck
         Returns bottleneck type and confidence scores
         """
-        scores = {
-            'CPU': 0.0,
-            'Memory': 0.0,
-            'GPU': 0.0,
-            'GPU_Memory': 0.0,
-            'None': 0.0
-        }
+        # Thresholds and score scaling, in the order _score_kernel expects them.
+        # Read on every call so changes to self.thresholds take effect
+        thresholds = self.thresholds
+        params = (
+            thresholds['cpu_high'], 1.0 / 30.0,         # Reduced weight for overall CPU %
+            thresholds['memory_high'], 1.0 / 15.0,
+            thresholds['gpu_high'], 1.0 / 10.0,
+            thresholds['gpu_memory_high'], 1.0 / 15.0,
+        )
         
-        # Enhanced CPU bottleneck analysis for multi-core systems
-        max_core_usage = max(metrics.cpu_per_core) if metrics.cpu_per_core else 0
-        
-        # Single-core saturation is more important than overall CPU %
-        if max_core_usage > 85.0:
-            scores['CPU'] += 0.8  # High confidence for single-core bottleneck
-        elif max_core_usage > 70.0:
-            scores['CPU'] += 0.5  # Moderate confidence
-        elif max_core_usage > 60.0:
-            scores['CPU'] += 0.3  # Some CPU pressure
-        
-        # Overall CPU usage (less important for gaming)
-        if metrics.cpu_percent > self.thresholds['cpu_high']:
-            scores['CPU'] += (metrics.cpu_percent - self.thresholds['cpu_high']) / 30.0  # Reduced weight
-        
-        # Falcon BMS specific CPU analysis
-        if metrics.falcon_bms_cpu > 150.0:  # More than 1.5 cores
-            scores['CPU'] += 0.4
-        elif metrics.falcon_bms_cpu > 100.0:  # More than 1 core
-            scores['CPU'] += 0.2
-        
-        # Memory bottleneck analysis
-        if metrics.memory_percent > self.thresholds['memory_high']:
-            scores['Memory'] += (metrics.memory_percent - self.thresholds['memory_high']) / 15.0
-        
-        # GPU bottleneck analysis
-        if self.gpu_available:
-            if metrics.gpu_utilization > self.thresholds['gpu_high']:
-                scores['GPU'] += (metrics.gpu_utilization - self.thresholds['gpu_high']) / 10.0
-            
-            if metrics.gpu_memory_percent > self.thresholds['gpu_memory_high']:
-                scores['GPU_Memory'] += (metrics.gpu_memory_percent - self.thresholds['gpu_memory_high']) / 15.0
-        
-        # If no significant bottleneck detected
-        max_score = max(scores.values())
-        if max_score < 0.3:
-            scores['None'] = 1.0
-        
-        # Normalize scores
-        total_score = sum(scores.values())
-        if total_score > 0:
-            scores = {k: v / total_score for k, v in scores.items()}
+        scores = _score_kernel(
+            metrics.cpu_max_core, metrics.cpu_percent, metrics.falcon_bms_cpu,
+            metrics.memory_percent, metrics.gpu_utilization, metrics.gpu_memory_percent,
+            self.gpu_available, params
+        )
         
         # Determine primary bottleneck
-        bottleneck = max(scores.items(), key=lambda x: x[1])[0]
+        bottleneck = BOTTLENECK_TYPES[scores.index(max(scores))]
         
-        return bottleneck, scores
+        return bottleneck, dict(zip(BOTTLENECK_TYPES, scores))
 
     def _collect_metrics(self) -> SystemMetrics:
         """Collect current system metrics"""
-        timestamp = datetime.now()
+        timestamp = time.monotonic()
         
-        # CPU metrics
-        cpu_percent = psutil.cpu_percent(interval=None)
+        # CPU metrics (overall usage is the mean of the per-core values)
         cpu_per_core = psutil.cpu_percent(interval=None, percpu=True)
+        cpu_percent = sum(cpu_per_core) / len(cpu_per_core) if cpu_per_core else 0.0
+        cpu_max_core = max(cpu_per_core) if cpu_per_core else 0.0
         
         # Memory metrics
         memory = psutil.virtual_memory()
@@ -181,8 +348,11 @@ class PerformanceMonitor:
         memory_used_gb = memory.used / (1024**3)
         memory_available_gb = memory.available / (1024**3)
         
-        # GPU metrics
-        gpu_util, gpu_mem_percent, gpu_mem_used_gb, gpu_temp = self._get_gpu_metrics()
+        # GPU metrics (refreshed every Nth sample, the last reading is reused in between)
+        if self._gpu_tick % self._gpu_sample_every == 0:
+            self._last_gpu = self._get_gpu_metrics()
+        self._gpu_tick += 1
+        gpu_util, gpu_mem_percent, gpu_mem_used_gb, gpu_temp = self._last_gpu
         
         # Falcon BMS specific metrics
         falcon_process = self._find_falcon_bms_process()
@@ -191,8 +361,10 @@ class PerformanceMonitor:
         
         if falcon_process:
             try:
-                falcon_cpu = falcon_process.cpu_percent()
-                falcon_memory_mb = falcon_process.memory_info().rss / (1024**2)
+                # oneshot() lets both reads share a single process info query
+                with falcon_process.oneshot():
+                    falcon_cpu = falcon_process.cpu_percent()
+                    falcon_memory_mb = falcon_process.memory_info().rss / (1024**2)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
         
@@ -201,6 +373,7 @@ class PerformanceMonitor:
             timestamp=timestamp,
             cpu_percent=cpu_percent,
             cpu_per_core=cpu_per_core,
+            cpu_max_core=cpu_max_core,
             memory_percent=memory_percent,
             memory_used_gb=memory_used_gb,
             memory_available_gb=memory_available_gb,
@@ -226,7 +399,7 @@ class PerformanceMonitor:
         while self.running:
             try:
                 metrics = self._collect_metrics()
-                self.metrics_history.append(metrics)
+                self._record_metrics(metrics)
                 time.sleep(self.sample_interval)
             except Exception as e:
                 print(f"Error in monitoring loop: {e}")
@@ -247,9 +420,32 @@ class PerformanceMonitor:
             self.monitor_thread.join()
         print("Performance monitoring stopped.")
 
+    def _record_metrics(self, metrics: SystemMetrics):
+        """
+        Store a sample in the history ring buffers
+        
+        Only the monitor thread writes, so no lock is needed: the slot is filled first
+        and then published by bumping _write_idx (a single, GIL-atomic store). Readers
+        take one snapshot of _write_idx and only look at slots published before it.
+        """
+        n_types = len(BOTTLENECK_TYPES)
+        slot = self._write_idx % self.history_size
+        self._hist_timestamp[slot] = metrics.timestamp
+        self._hist_bottleneck[slot] = BOTTLENECK_TYPES.index(metrics.bottleneck)
+        base = slot * n_types
+        for i, component in enumerate(BOTTLENECK_TYPES):
+            self._hist_scores[base + i] = metrics.bottleneck_score.get(component, 0.0)
+        self._current = metrics
+        self._write_idx += 1
+
+    @property
+    def sample_count(self) -> int:
+        """Number of samples currently held in the history"""
+        return min(self._write_idx, self.history_size)
+
     def get_current_metrics(self) -> Optional[SystemMetrics]:
         """Get the most recent metrics"""
-        return self.metrics_history[-1] if self.metrics_history else None
+        return self._current
 
     def get_bottleneck_analysis(self, window_seconds: int = 30) -> Dict:
         """
@@ -258,37 +454,45 @@ class PerformanceMonitor:
         Args:
             window_seconds: Analysis window in seconds
         """
-        if not self.metrics_history:
+        # Snapshot the write index once. The slot after the newest one may be being
+        # overwritten right now, so a full buffer is read minus its oldest sample.
+        write_idx = self._write_idx
+        current = self._current
+        count = min(write_idx, max(1, self.history_size - 1))
+        if current is None or count == 0:
             return {"error": "No metrics data available"}
         
-        # Get metrics within the time window
-        cutoff_time = datetime.now() - timedelta(seconds=window_seconds)
-        recent_metrics = [m for m in self.metrics_history if m.timestamp >= cutoff_time]
-        
-        if not recent_metrics:
-            recent_metrics = [self.metrics_history[-1]]
-        
-        # Aggregate bottleneck scores
-        bottleneck_counts = defaultdict(int)
-        avg_scores = defaultdict(list)
-        
-        for metrics in recent_metrics:
-            bottleneck_counts[metrics.bottleneck] += 1
-            for component, score in metrics.bottleneck_score.items():
-                avg_scores[component].append(score)
+        cached = self._cached_analysis
+        if cached is not None and cached[0] == write_idx and cached[1] == window_seconds:
+            return cached[2]
+        
+        # Walk back from the newest sample until we leave the time window
+        # (the newest sample is always used, even if it is older than the window)
+        cutoff_time = time.monotonic() - window_seconds
+        n_types = len(BOTTLENECK_TYPES)
+        newest = write_idx - 1
+        bottleneck_counts = [0] * n_types
+        score_sums = [0.0] * n_types
+        used = 0
+        for age in range(count):
+            slot = (newest - age) % self.history_size
+            if age > 0 and self._hist_timestamp[slot] < cutoff_time:
+                break
+            bottleneck_counts[self._hist_bottleneck[slot]] += 1
+            base = slot * n_types
+            for i in range(n_types):
+                score_sums[i] += self._hist_scores[base + i]
+            used += 1
         
         # Calculate averages
-        final_scores = {}
-        for component, scores in avg_scores.items():
-            final_scores[component] = sum(scores) / len(scores)
+        final_scores = {component: score_sums[i] / used for i, component in enumerate(BOTTLENECK_TYPES)}
+        bottleneck_frequency = {component: bottleneck_counts[i]
+                                for i, component in enumerate(BOTTLENECK_TYPES) if bottleneck_counts[i]}
         
-        # Get current metrics
-        current = recent_metrics[-1]
-        
-        return {
+        analysis = {
             "current_bottleneck": current.bottleneck,
             "bottleneck_confidence": final_scores,
-            "bottleneck_frequency": dict(bottleneck_counts),
+            "bottleneck_frequency": bottleneck_frequency,
             "current_metrics": {
                 "cpu_percent": current.cpu_percent,
                 "memory_percent": current.memory_percent,
@@ -299,117 +503,98 @@ class PerformanceMonitor:
             },
             "recommendations": self._get_recommendations(current)
         }
+        self._cached_analysis = (write_idx, window_seconds, analysis)
+        return analysis
 
     def _get_recommendations(self, metrics: SystemMetrics) -> List[str]:
         """Get performance recommendations based on current metrics"""
-        recommendations = []
-        
-        max_core_usage = max(metrics.cpu_per_core) if metrics.cpu_per_core else 0
-        
-        if metrics.bottleneck == "CPU":
-            if max_core_usage > 80:
-                recommendations.extend([
-                    f"Single-core bottleneck detected (Core at {max_core_usage:.0f}%)",
-                    "Falcon BMS is limited by single-threaded performance",
-                    "Consider overclocking your CPU for better single-core performance",
-                    "Lower CPU-intensive settings: AI traffic, ground objects, weather complexity"
-                ])
-            else:
-                recommendations.extend([
-                    "CPU bottleneck detected - reduce CPU-intensive settings",
-                    "Close unnecessary background applications",
-                    "Lower AI traffic and ground object density",
-                    "Consider upgrading to a faster CPU"
-                ])
-        elif metrics.bottleneck == "Memory":
-            recommendations.extend([
-                "Memory shortage detected - close unnecessary applications",
-                "Consider adding more RAM to your system",
-                "Lower texture quality in Falcon BMS settings",
-                "Check for memory leaks in background processes"
-            ])
-        elif metrics.bottleneck == "GPU":
-            recommendations.extend([
-                "GPU bottleneck - lower graphics settings in Falcon BMS",
-                "Reduce anti-aliasing and post-processing effects",
-                "Lower VR resolution or use dynamic resolution scaling",
-                "Check GPU temperatures and fan curves"
-            ])
-        elif metrics.bottleneck == "GPU_Memory":
-            recommendations.extend([
-                "GPU memory bottleneck - lower texture quality and resolution",
-                "Reduce visual range and object density in VR",
-                "Close other GPU-intensive applications",
-                "Consider a GPU upgrade with more VRAM"
-            ])
-        else:
-            recommendations.append("System performance appears balanced. No immediate bottlenecks detected.")
-            if max_core_usage > 60:
-                recommendations.append(f"Note: Highest core usage is {max_core_usage:.0f}% - monitor for single-core limits")
+        max_core_usage = metrics.cpu_max_core
+        
+        if metrics.bottleneck == "CPU" and max_core_usage > 80:
+            return [f"Single-core bottleneck detected (Core at {max_core_usage:.0f}%)", *_REC_CPU_SINGLE_CORE]
+        
+        recommendations = _RECOMMENDATIONS.get(metrics.bottleneck)
+        if recommendations is not None:
+            return list(recommendations)
+        
+        recommendations = [_REC_BALANCED]
+        if max_core_usage > 60:
+            recommendations.append(f"Note: Highest core usage is {max_core_usage:.0f}% - monitor for single-core limits")
         
         return recommendations
 
     def print_real_time_status(self):
         """Print real-time status to console"""
+        # Clear the screen with an escape sequence prepended to each frame, so a
+        # refresh is a single write+flush; fall back to cls/clear without ANSI
+        clear = CLEAR_SCREEN if enable_ansi_console() else ""
         while self.running:
             try:
-                os.system('cls' if os.name == 'nt' else 'clear')
+                if not clear:
+                    os.system('cls' if os.name == 'nt' else 'clear')
                 
                 current = self.get_current_metrics()
                 if not current:
-                    print("Collecting initial data...")
+                    sys.stdout.write(clear + "Collecting initial data...\n")
+                    sys.stdout.flush()
                     time.sleep(1)
                     continue
                 
                 analysis = self.get_bottleneck_analysis(30)
                 
-                print("=" * 80)
-                print(f"FALCON BMS PERFORMANCE MONITOR - {current.timestamp.strftime('%H:%M:%S')}")
-                print("=" * 80)
+                # Build the whole screen and write it in one go
+                lines = []
+                lines.append("=" * 80)
+                lines.append(f"FALCON BMS PERFORMANCE MONITOR - {datetime.now().strftime('%H:%M:%S')}")
+                lines.append("=" * 80)
                 
                 # System metrics
-                print(f"\n📊 SYSTEM METRICS:")
-                print(f"  CPU Usage:     {current.cpu_percent:6.1f}% overall (Max core: {max(current.cpu_per_core):6.1f}%)")
-                print(f"  Memory Usage:  {current.memory_percent:6.1f}% ({current.memory_used_gb:.1f}GB used)")
+                lines.append(f"\n📊 SYSTEM METRICS:")
+                lines.append(f"  CPU Usage:     {current.cpu_percent:6.1f}% overall (Max core: {current.cpu_max_core:6.1f}%)")
+                lines.append(f"  Memory Usage:  {current.memory_percent:6.1f}% ({current.memory_used_gb:.1f}GB used)")
                 
                 # Show top 4 most active CPU cores for better insight
-                top_cores = sorted(enumerate(current.cpu_per_core), key=lambda x: x[1], reverse=True)[:4]
-                core_info = ", ".join([f"C{core}:{usage:.0f}%" for core, usage in top_cores if usage > 5])
+                per_core = current.cpu_per_core
+                top_cores = heapq.nlargest(4, range(len(per_core)), key=per_core.__getitem__)
+                core_info = ", ".join([f"C{core}:{per_core[core]:.0f}%" for core in top_cores if per_core[core] > 5])
                 if core_info:
-                    print(f"  Active Cores:  {core_info}")
+                    lines.append(f"  Active Cores:  {core_info}")
                 
                 if self.gpu_available:
-                    print(f"  GPU Usage:     {current.gpu_utilization:6.1f}% (Temp: {current.gpu_temperature:.0f}°C)")
-                    print(f"  GPU Memory:    {current.gpu_memory_percent:6.1f}% ({current.gpu_memory_used_gb:.1f}GB used)")
+                    lines.append(f"  GPU Usage:     {current.gpu_utilization:6.1f}% (Temp: {current.gpu_temperature:.0f}°C)")
+                    lines.append(f"  GPU Memory:    {current.gpu_memory_percent:6.1f}% ({current.gpu_memory_used_gb:.1f}GB used)")
                 else:
-                    print(f"  GPU Usage:     Not available (install GPUtil for GPU monitoring)")
+                    lines.append(f"  GPU Usage:     Not available (install nvidia-ml-py3 or GPUtil for GPU monitoring)")
                 
                 # Falcon BMS specific
-                print(f"\n🎮 FALCON BMS:")
+                lines.append(f"\n🎮 FALCON BMS:")
                 if current.falcon_bms_cpu > 0:
-                    print(f"  Process CPU:   {current.falcon_bms_cpu:6.1f}%")
-                    print(f"  Process RAM:   {current.falcon_bms_memory_mb:6.0f}MB")
+                    lines.append(f"  Process CPU:   {current.falcon_bms_cpu:6.1f}%")
+                    lines.append(f"  Process RAM:   {current.falcon_bms_memory_mb:6.0f}MB")
                 else:
-                    print(f"  Status:        Not detected (not running or different process name)")
+                    lines.append(f"  Status:        Not detected (not running or different process name)")
                 
                 # Bottleneck analysis
-                print(f"\n🚨 BOTTLENECK ANALYSIS:")
-                print(f"  Primary:       {analysis['current_bottleneck']}")
+                lines.append(f"\n🚨 BOTTLENECK ANALYSIS:")
+                lines.append(f"  Primary:       {analysis['current_bottleneck']}")
                 
-                print(f"  Confidence:")
+                lines.append(f"  Confidence:")
                 for component, confidence in sorted(analysis['bottleneck_confidence'].items(), 
                                                   key=lambda x: x[1], reverse=True):
                     if confidence > 0.1:
-                        bar = "█" * int(confidence * 20)
-                        print(f"    {component:12s} {confidence:5.1%} {bar}")
+                        bar = FULL_BAR[:int(confidence * 20)]
+                        lines.append(f"    {component:12s} {confidence:5.1%} {bar}")
                 
                 # Recommendations
-                print(f"\n💡 RECOMMENDATIONS:")
+                lines.append(f"\n💡 RECOMMENDATIONS:")
                 for i, rec in enumerate(analysis['recommendations'][:3], 1):
-                    print(f"  {i}. {rec}")
+                    lines.append(f"  {i}. {rec}")
+                
+                lines.append(f"\n⏱️  Monitoring for {self.sample_count} samples")
+                lines.append("   Press Ctrl+C to stop monitoring")
                 
-                print(f"\n⏱️  Monitoring for {len(self.metrics_history)} samples")
-                print("   Press Ctrl+C to stop monitoring")
+                sys.stdout.write(clear + "\n".join(lines) + "\n")
+                sys.stdout.flush()
                 
                 time.sleep(2)
                 